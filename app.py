@@ -19,7 +19,7 @@ def main():
         # Check if data was loaded successfully
         if df is None or df.empty:
             st.error("Failed to load data. Please check if the CSV file exists and is properly formatted.")
-            st.info("Please ensure 'dotReview_data_updated.csv' is in the project directory and contains valid data.")
+            st.info("Please ensure 'dotReview_data_updated.csv' and 'dotReview_data.csv' are in the project directory and contain valid data.")
             return
 
         # Display data info for debugging
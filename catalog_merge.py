@@ -0,0 +1,242 @@
+# catalog_merge.py
+import argparse
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+NUTRIENT_COLUMNS = ['energy_kcal', 'protein', 'carbohydrates', 'total_sugars', 'added_sugar',
+                    'dietary_fiber', 'trans_fat', 'saturated_fat', 'total_fat', 'cholesterol_mg',
+                    'sodium_mg', 'iron_mg', 'calcium_mg']
+CATALOG_COLUMNS = ['name'] + NUTRIENT_COLUMNS
+
+DEFAULT_SOURCES = ("dotReview_data_updated.csv", "dotReview_data.csv")
+ENCODINGS_TO_TRY = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
+
+# Pack-size and quantity suffixes such as "200g", "1.5 kg", "500 ml", "pack of 6", "(x12)"
+PACK_SIZE_PATTERN = re.compile(
+    r'\b(?:pack\s+of\s+\d+|\d+(?:\.\d+)?\s*(?:g|gm|gms|gram|grams|kg|ml|l|ltr|litre|pcs|pc|n)\b|x\s*\d+\b)'
+)
+COMBINING_MARK_PATTERN = re.compile(r'[\u0300-\u036f]')
+NON_ALPHANUMERIC_PATTERN = re.compile(r'[^a-z0-9]+')
+
+# Nutrient blocks with more distinct names than this are too generic to compare pairwise
+MAX_CANDIDATE_BLOCK = 50
+
+
+def read_source(path):
+    """Read one supplier file into the catalog columns, tagging each row with its source."""
+    df = None
+    for encoding in ENCODINGS_TO_TRY:
+        try:
+            logging.info(f"Reading {path} with {encoding} encoding...")
+            # Ingredient lists are unquoted and spill over a variable number of fields,
+            # so only the leading name and nutrient columns are kept.
+            df = pd.read_csv(path, encoding=encoding, header=0, usecols=range(len(CATALOG_COLUMNS)),
+                             names=CATALOG_COLUMNS, index_col=False, on_bad_lines='skip')
+            break
+        except UnicodeDecodeError as e:
+            logging.warning(f"Failed to read {path} with {encoding} encoding: {str(e)}")
+            continue
+
+    if df is None:
+        raise Exception(f"Could not read {path} with any of the attempted encodings")
+
+    numeric = df[NUTRIENT_COLUMNS].apply(pd.to_numeric, errors='coerce')
+    # Values such as "12g" or "<0.5" become NaN, which drops the row from nutrient matching
+    coerced = int((numeric.isna() & df[NUTRIENT_COLUMNS].notna()).sum().sum())
+    if coerced:
+        logging.warning(f"Coerced {coerced} non-numeric nutrient values to NaN in {path}")
+    df[NUTRIENT_COLUMNS] = numeric
+    df['name'] = df['name'].astype(str).str.strip()
+    df = df[df['name'].ne('') & df['name'].ne('nan')].assign(source=os.path.basename(path))
+    logging.info(f"Loaded {len(df)} rows from {path}")
+    return df
+
+
+def read_source_or_skip(path):
+    """Read one supplier file, logging and skipping it if it cannot be loaded."""
+    try:
+        return read_source(path)
+    except FileNotFoundError:
+        logging.error(f"Source file '{path}' not found, skipping it")
+    except Exception as e:
+        logging.error(f"Error reading source file '{path}', skipping it: {str(e)}")
+    return None
+
+
+def load_sources(paths, max_workers=None):
+    """Read all supplier files concurrently and stack them in the given order.
+
+    Files that cannot be read are logged and left out of the merge.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        frames = list(executor.map(read_source_or_skip, paths))
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=CATALOG_COLUMNS + ['source'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def normalize_names(names):
+    """Fold accents, lower-case, strip pack sizes and punctuation so name variants share one key."""
+    # Normalize each distinct spelling once; supplier files repeat names heavily
+    codes, uniques = pd.factorize(names)
+    # "Nestlé" and "Nestle" must agree, so decompose accents and drop the marks
+    normalized = pd.Series(uniques).str.normalize('NFKD').str.replace(COMBINING_MARK_PATTERN, '', regex=True)
+    normalized = normalized.str.lower().str.replace(PACK_SIZE_PATTERN, ' ', regex=True)
+    normalized = normalized.str.replace(NON_ALPHANUMERIC_PATTERN, ' ', regex=True).str.strip()
+    return pd.Series(normalized.to_numpy()[codes], index=names.index)
+
+
+def blocking_keys(df, nutrient_precision=1):
+    """Build the normalized name key and both blocking keys, as integer codes.
+
+    Rows sharing a name code are the same product. Rows sharing a nutrient
+    code only have the same rounded nutrient panel and are merely candidates,
+    to be confirmed by name similarity. A code of -1 means the row has no
+    value for that key.
+    """
+    name_key = normalize_names(df['name'])
+    name_codes = pd.Series(pd.factorize(name_key.where(name_key.ne('')))[0], index=df.index)
+
+    nutrients = df[NUTRIENT_COLUMNS].round(nutrient_precision)
+    # Partial panels are too ambiguous and all-zero panels are placeholders, so the
+    # NaN groups dropped by groupby and the zero rows are left without a code.
+    nutrient_codes = nutrients.groupby(NUTRIENT_COLUMNS, sort=False).ngroup()
+    nutrient_codes = nutrient_codes.where(nutrients.ne(0).any(axis=1)).fillna(-1).astype(int)
+
+    return name_key, name_codes, nutrient_codes
+
+
+def similar_name_pairs(name_key, name_codes, nutrient_codes, min_similarity=0.5,
+                       max_block_size=MAX_CANDIDATE_BLOCK):
+    """Return the row pairs whose nutrient panels match and whose names are similar.
+
+    Names within a nutrient block are compared by token Jaccard similarity. Each
+    distinct name is compared once per block, and blocks holding more than
+    max_block_size distinct names are skipped to keep the pair count bounded.
+    """
+    candidates = pd.DataFrame({'block': nutrient_codes, 'name_code': name_codes,
+                               'row': np.arange(len(name_codes))})
+    candidates = candidates[candidates['block'].ge(0) & candidates['name_code'].ge(0)]
+    candidates = candidates.drop_duplicates(['block', 'name_code'])
+
+    block_sizes = candidates['block'].map(candidates['block'].value_counts())
+    oversized = candidates.loc[block_sizes > max_block_size, 'block'].nunique()
+    if oversized:
+        logging.warning(f"Skipped {oversized} nutrient blocks with more than {max_block_size} distinct names")
+    candidates = candidates[block_sizes.between(2, max_block_size)]
+
+    pairs = candidates.merge(candidates, on='block', suffixes=('_a', '_b'))
+    pairs = pairs[pairs['name_code_a'] < pairs['name_code_b']]
+
+    names = candidates.drop_duplicates('name_code')
+    tokens = {code: set(key.split())
+              for code, key in zip(names['name_code'].to_numpy(), name_key.to_numpy()[names['row'].to_numpy()])}
+    similar = [len(tokens[a] & tokens[b]) / len(tokens[a] | tokens[b]) >= min_similarity
+               for a, b in zip(pairs['name_code_a'].to_numpy(), pairs['name_code_b'].to_numpy())]
+    pairs = pairs[np.array(similar, dtype=bool)]
+    return pairs['row_a'].to_numpy(), pairs['row_b'].to_numpy()
+
+
+def cluster_duplicates(name_codes, pairs):
+    """Assign a cluster id per row, joining rows that share a name code or a matched pair.
+
+    Each row is linked to the first row with its name code, and each (rows_a,
+    rows_b) pair is linked directly. The resulting sparse graph is split into
+    connected components, which is linear in the number of rows and pairs.
+    """
+    name_codes = np.asarray(name_codes)
+    n_rows = len(name_codes)
+    rows = np.flatnonzero(name_codes >= 0)
+    # Name codes come from factorize and are dense, so first rows can be found without sorting
+    first_row = np.full(name_codes.max() + 1 if len(rows) else 0, n_rows)
+    np.minimum.at(first_row, name_codes[rows], rows)
+
+    sources = np.concatenate([rows, pairs[0]])
+    targets = np.concatenate([first_row[name_codes[rows]], pairs[1]])
+    graph = coo_matrix((np.ones(len(sources), dtype=np.int8), (sources, targets)), shape=(n_rows, n_rows))
+    # Components are numbered in order of their first row, so earlier rows keep earlier ids
+    _, labels = connected_components(graph, directed=False)
+    return labels
+
+
+def join_distinct(df, column):
+    """Join the distinct values of a column per product, in first-seen order."""
+    pairs = df[['product_id', column]].drop_duplicates()
+    joined = pairs.drop_duplicates('product_id').set_index('product_id')[column]
+    # Only products with more than one distinct value need a Python-level join
+    repeated = pairs[pairs['product_id'].duplicated(keep=False)]
+    values = {}
+    for product_id, value in zip(repeated['product_id'].to_numpy(), repeated[column].to_numpy()):
+        values.setdefault(product_id, []).append(value)
+    if values:
+        joined.update(pd.Series({product_id: '; '.join(v) for product_id, v in values.items()}))
+    return joined
+
+
+def merge_catalog(df, nutrient_precision=1, min_similarity=0.5):
+    """Collapse near-duplicate rows into one product each, keeping provenance.
+
+    The representative row is the one with the most nutrient values filled in,
+    with earlier sources winning ties.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=CATALOG_COLUMNS + ['sources', 'name_variants', 'duplicate_count'])
+
+    df = df.reset_index(drop=True)
+    name_key, name_codes, nutrient_codes = blocking_keys(df, nutrient_precision)
+    pairs = similar_name_pairs(name_key, name_codes, nutrient_codes, min_similarity)
+    df['product_id'] = cluster_duplicates(name_codes, pairs)
+    df['_filled'] = df[NUTRIENT_COLUMNS].notna().sum(axis=1)
+
+    provenance = pd.DataFrame({
+        'sources': join_distinct(df, 'source'),
+        'name_variants': join_distinct(df, 'name'),
+        'duplicate_count': df.groupby('product_id', sort=False).size(),
+    })
+
+    representatives = (df.sort_values(['product_id', '_filled'], ascending=[True, False], kind='stable')
+                         .drop_duplicates('product_id')
+                         .set_index('product_id'))
+    catalog = representatives[CATALOG_COLUMNS].join(provenance)
+
+    logging.info(f"Merged {len(df)} rows into {len(catalog)} products")
+    return catalog.reset_index(drop=True)
+
+
+def build_catalog(paths=None, max_workers=None, nutrient_precision=1, min_similarity=0.5):
+    if paths is None:
+        paths = DEFAULT_SOURCES
+    return merge_catalog(load_sources(paths, max_workers=max_workers), nutrient_precision=nutrient_precision,
+                         min_similarity=min_similarity)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Merge supplier files into one deduplicated catalog.")
+    parser.add_argument('sources', nargs='*', default=list(DEFAULT_SOURCES),
+                        help="Source CSV files, in priority order")
+    parser.add_argument('-o', '--output', default="dotReview_catalog.csv", help="Merged catalog path")
+    parser.add_argument('--workers', type=int, default=None, help="Number of files read in parallel")
+    parser.add_argument('--nutrient-precision', type=int, default=1,
+                        help="Decimal places nutrients are rounded to before matching")
+    parser.add_argument('--min-similarity', type=float, default=0.5,
+                        help="Token Jaccard similarity needed to merge names with matching nutrients")
+    args = parser.parse_args()
+
+    catalog = build_catalog(args.sources, max_workers=args.workers, nutrient_precision=args.nutrient_precision,
+                            min_similarity=args.min_similarity)
+    catalog.to_csv(args.output, index=False)
+    logging.info(f"Wrote {len(catalog)} products to {args.output}")
+
+
+if __name__ == "__main__":
+    main()